@@ -0,0 +1 @@
+def sample_span_id(span_id: int, threshold: int) -> bool: ...
@@ -0,0 +1,31 @@
+"""
+Hashing kernel used by span sampling rules.
+
+A span is kept when ``(span_id * KNUTH_FACTOR) % 2**64`` is lower than or equal
+to the threshold derived from the sample rate. Unsigned 64-bit multiplication
+wraps around modulo ``2**64``, so the hash can be computed with a single C
+multiplication instead of Python integer arithmetic.
+"""
+
+cdef extern from "_stdint.h" nogil:
+    ctypedef unsigned long long uint64_t
+
+
+# Big prime number to make hashing better distributed
+cdef uint64_t KNUTH_FACTOR = 1111111111111111111ULL
+
+
+cdef inline bint _sample_id(uint64_t span_id, uint64_t threshold) nogil:
+    return span_id * KNUTH_FACTOR <= threshold
+
+
+cpdef bint sample_span_id(object span_id, uint64_t threshold):
+    cdef uint64_t id_
+
+    try:
+        id_ = span_id
+    except OverflowError:
+        # Span ids set explicitly might not fit in 64 bits, only their lowest 64 bits contribute to the hash
+        id_ = span_id & 0xFFFFFFFFFFFFFFFF
+
+    return _sample_id(id_, threshold)
@@ -1,3 +1,8 @@
+import functools
+import operator
+import re
+from typing import Callable
+
 from .utils.cache import cachedmethod
 
 
@@ -49,3 +54,35 @@ class GlobMatcher(object):
 
             return False
         return True
+
+
+def is_literal_glob(pattern):
+    # type: (str) -> bool
+    """Returns whether the glob pattern has no wildcard, i.e. it only matches itself"""
+    return "*" not in pattern and "?" not in pattern
+
+
+def compile_glob(pattern):
+    # type: (str) -> Callable[[str], bool]
+    """Compile a glob pattern into the cheapest callable able to match subjects against it.
+
+    Patterns without wildcards are compared for equality and patterns whose only wildcard is a
+    trailing `*` are checked as prefixes. Patterns with at most one `*` are translated to a
+    regular expression, while the others fall back to :class:`GlobMatcher` so that matching
+    can't backtrack catastrophically.
+    """
+    if is_literal_glob(pattern):
+        return functools.partial(operator.eq, pattern)
+
+    stars = pattern.count("*")
+
+    if stars == 1 and pattern[-1] == "*" and "?" not in pattern:
+        prefix = pattern[:-1]
+        return lambda subject: subject.startswith(prefix)
+
+    if stars <= 1:
+        regex = "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern)
+        match = re.compile(regex + r"\Z", re.DOTALL).match
+        return lambda subject: match(subject) is not None
+
+    return GlobMatcher(pattern).match
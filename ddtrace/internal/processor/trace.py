@@ -5,6 +5,7 @@ from typing import DefaultDict
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 import attr
 import six
@@ -15,6 +16,7 @@ from ddtrace.constants import USER_KEEP
 from ddtrace.internal.logger import get_logger
 from ddtrace.internal.processor import SpanProcessor
 from ddtrace.internal.sampling import SpanSamplingRule
+from ddtrace.internal.sampling import SpanSamplingRuleSet
 from ddtrace.internal.sampling import is_single_span_sampled
 from ddtrace.internal.service import ServiceStatusError
 from ddtrace.internal.writer import TraceWriter
@@ -226,6 +228,11 @@ class SpanAggregator(SpanProcessor):
             pass
 
 
+def _to_rules_tuple(rules):
+    # type: (Iterable[SpanSamplingRule]) -> Tuple[SpanSamplingRule, ...]
+    return tuple(rules)
+
+
 @attr.s
 class SpanSamplingProcessor(SpanProcessor):
     """SpanProcessor for sampling single spans:
@@ -238,7 +245,14 @@ class SpanSamplingProcessor(SpanProcessor):
       Agent even if the dropped trace is not (as is the case when trace stats computation is enabled).
     """
 
-    rules = attr.ib(type=List[SpanSamplingRule])
+    # The rules are stored as a tuple since the rule set below indexes them once at creation
+    rules = attr.ib(type=Tuple[SpanSamplingRule, ...], converter=_to_rules_tuple)
+    _rule_set = attr.ib(
+        default=attr.Factory(lambda self: SpanSamplingRuleSet(self.rules), takes_self=True),
+        init=False,
+        type=SpanSamplingRuleSet,
+        repr=False,
+    )
 
     def on_span_start(self, span):
         # type: (Span) -> None
@@ -248,12 +262,11 @@ class SpanSamplingProcessor(SpanProcessor):
         # type: (Span) -> None
         # only sample if the span isn't already going to be sampled by trace sampler
         if span.context.sampling_priority is not None and span.context.sampling_priority <= 0:
-            for rule in self.rules:
-                if rule.match(span):
-                    rule.sample(span)
-                    # If stats computation is enabled, we won't send all spans to the agent.
-                    # In order to ensure that the agent does not update priority sampling rates
-                    # due to single spans sampling, we set all of these spans to manual keep.
-                    if config._trace_compute_stats:
-                        span.set_metric(SAMPLING_PRIORITY_KEY, USER_KEEP)
-                    break
+            rule = self._rule_set.match(span)
+            if rule is not None:
+                rule.sample(span)
+                # If stats computation is enabled, we won't send all spans to the agent.
+                # In order to ensure that the agent does not update priority sampling rates
+                # due to single spans sampling, we set all of these spans to manual keep.
+                if config._trace_compute_stats:
+                    span.set_metric(SAMPLING_PRIORITY_KEY, USER_KEEP)
@@ -1,9 +1,10 @@
 import json
 import os
-import re
 from typing import Optional
 from typing import TYPE_CHECKING
 
+from six.moves import intern
+
 
 # TypedDict was added to typing in python 3.8
 try:
@@ -14,31 +15,69 @@ except ImportError:
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_MAX_PER_SEC
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_MECHANISM
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_RATE
-from ddtrace.internal.glob_matching import GlobMatcher
+from ddtrace.internal._sampling import sample_span_id
+from ddtrace.internal.glob_matching import compile_glob
+from ddtrace.internal.glob_matching import is_literal_glob
 from ddtrace.internal.logger import get_logger
+from ddtrace.internal.utils.cache import cached
 
 from .rate_limiter import RateLimiter
 
 
 log = get_logger(__name__)
 
-try:
-    from json.decoder import JSONDecodeError
-except ImportError:
-    # handling python 2.X import error
-    JSONDecodeError = ValueError  # type: ignore
 
 if TYPE_CHECKING:
+    from typing import Any
+    from typing import Callable
     from typing import Dict
+    from typing import Iterable
     from typing import List
     from typing import Text
+    from typing import Tuple
+    from typing import Type
+    from typing import Union
 
     from ddtrace.context import Context
     from ddtrace.span import Span
 
+
+def _get_json_decoder():
+    # type: () -> Tuple[Callable[[str], Any], Type[Exception]]
+    try:
+        from json.decoder import JSONDecodeError
+    except ImportError:
+        # handling python 2.X import error
+        json_decode_error = ValueError  # type: Type[Exception]
+    else:
+        json_decode_error = JSONDecodeError
+
+    # Use orjson to parse span sampling rules when it is available as it is faster than the json module
+    try:
+        import orjson
+    except ImportError:
+        return json.loads, json_decode_error
+
+    def loads(raw):
+        # type: (str) -> Any
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the json module, e.g. it rejects NaN, Infinity and out of range numbers
+            return json.loads(raw)
+
+    return loads, json_decode_error
+
+
+_json_loads, JSONDecodeError = _get_json_decoder()
+
 # Big prime number to make hashing better distributed
 KNUTH_FACTOR = 1111111111111111111
 MAX_SPAN_ID = 2 ** 64
+# Maximum number of (service, name) pairs memoized by each span sampling rule
+_MATCH_CACHE_MAX_SIZE = 1024
+# Maximum number of services memoized by a span sampling rule set
+_RULE_SET_CACHE_MAX_SIZE = 1024
 
 
 class SamplingMechanism(object):
@@ -55,8 +94,9 @@ class SamplingMechanism(object):
 
 SAMPLING_DECISION_TRACE_TAG_KEY = "_dd.p.dm"
 
-# Use regex to validate trace tag value
-TRACE_TAG_RE = re.compile(r"^-([0-9])$")
+# Precomputed trace tag values for each sampling mechanism, avoiding string formatting on every trace.
+# The values are interned so that every trace shares the same string objects.
+_MECH_TAGS = tuple(intern("-%d" % i) for i in range(16))
 
 
 SpanSamplingRules = TypedDict(
@@ -71,42 +111,19 @@ SpanSamplingRules = TypedDict(
 )
 
 
-def _set_trace_tag(
-    context,  # type: Context
-    sampling_mechanism,  # type: int
-):
-    # type: (...) -> Optional[Text]
-
-    value = "-%d" % sampling_mechanism
-
-    context._meta[SAMPLING_DECISION_TRACE_TAG_KEY] = value
-
-    return value
-
-
-def _unset_trace_tag(
-    context,  # type: Context
-):
-    # type: (...) -> Optional[Text]
-    if SAMPLING_DECISION_TRACE_TAG_KEY not in context._meta:
-        return None
-
-    value = context._meta[SAMPLING_DECISION_TRACE_TAG_KEY]
-    del context._meta[SAMPLING_DECISION_TRACE_TAG_KEY]
-    return value
-
-
 def validate_sampling_decision(
     meta,  # type: Dict[str, str]
 ):
     # type: (...) -> Dict[str, str]
     value = meta.get(SAMPLING_DECISION_TRACE_TAG_KEY)
-    if value:
-        # Skip propagating invalid sampling mechanism trace tag
-        if TRACE_TAG_RE.match(value) is None:
-            del meta[SAMPLING_DECISION_TRACE_TAG_KEY]
-            meta["_dd.propagation_error"] = "decoding_error"
-            log.warning("failed to decode _dd.p.dm: %r", value, exc_info=True)
+    if value is None:
+        return meta
+
+    # Skip propagating invalid sampling mechanism trace tag, the only valid format is "-<digit>"
+    if len(value) != 2 or value[0] != "-" or not ("0" <= value[1] <= "9"):
+        del meta[SAMPLING_DECISION_TRACE_TAG_KEY]
+        meta["_dd.propagation_error"] = "decoding_error"
+        log.warning("failed to decode _dd.p.dm: %r", value, exc_info=True)
     return meta
 
 
@@ -118,23 +135,62 @@ def update_sampling_decision(
     # type: (...) -> Optional[Text]
     # When sampler keeps trace, we need to set sampling decision trace tag.
     # If sampler rejects trace, we need to remove sampling decision trace tag to avoid unnecessary propagation.
+    meta = context._meta
     if sampled:
-        return _set_trace_tag(context, sampling_mechanism)
-    else:
-        return _unset_trace_tag(context)
+        if 0 <= sampling_mechanism < len(_MECH_TAGS):
+            value = _MECH_TAGS[sampling_mechanism]
+        else:
+            value = "-%d" % sampling_mechanism
+        meta[SAMPLING_DECISION_TRACE_TAG_KEY] = value
+        return value
+    return meta.pop(SAMPLING_DECISION_TRACE_TAG_KEY, None)
+
+
+class _AlwaysAllowRateLimiter(object):
+    """Rate limiter allowing every request, used by rules without a limit"""
+
+    __slots__ = ()
+
+    def is_allowed(self, timestamp_ns):
+        # type: (int) -> bool
+        return True
+
+
+_ALWAYS_ALLOW = _AlwaysAllowRateLimiter()
+
+
+@cached(maxsize=256)
+def _get_glob_matcher(pattern):
+    # type: (str) -> Callable[[str], bool]
+    # Rules sharing a pattern share its compiled matcher
+    return compile_glob(pattern)
+
+
+def _keep_span(span):
+    # type: (Span) -> bool
+    return True
+
+
+def _drop_span(span):
+    # type: (Span) -> bool
+    return False
 
 
 class SpanSamplingRule:
     """A span sampling rule to evaluate and potentially tag each span upon finish."""
 
     __slots__ = (
+        "_service_pattern",
+        "_name_pattern",
         "_service_matcher",
         "_name_matcher",
         "_sample_rate",
         "_max_per_second",
         "_sampling_id_threshold",
+        "_sample",
         "_limiter",
         "_matcher",
+        "_match_cache",
     )
 
     def __init__(
@@ -145,14 +201,32 @@ class SpanSamplingRule:
         name=None,  # type: Optional[str]
     ):
         self._sample_rate = sample_rate
-        self._sampling_id_threshold = self._sample_rate * MAX_SPAN_ID
+        # The sample rate is fixed, so pick the sampling function once instead of checking the edge cases per span
+        if sample_rate >= 1:
+            self._sampling_id_threshold = MAX_SPAN_ID
+            self._sample = _keep_span  # type: Callable[[Span], bool]
+        elif sample_rate > 0:
+            # The rate is finite here, so the threshold can be converted to an int
+            self._sampling_id_threshold = int(sample_rate * MAX_SPAN_ID)
+            self._sample = self._sample_probabilistic
+        else:
+            # Negative rates and NaN drop every span
+            self._sampling_id_threshold = 0
+            self._sample = _drop_span
 
         self._max_per_second = max_per_second
-        self._limiter = RateLimiter(max_per_second)
+        # A negative limit allows every span, so there is no need to go through a rate limiter
+        self._limiter = (
+            RateLimiter(max_per_second) if max_per_second >= 0 else _ALWAYS_ALLOW
+        )  # type: Union[RateLimiter, _AlwaysAllowRateLimiter]
 
         # we need to create matchers for the service and/or name pattern provided
-        self._service_matcher = GlobMatcher(service) if service is not None else None
-        self._name_matcher = GlobMatcher(name) if name is not None else None
+        self._service_pattern = service
+        self._name_pattern = name
+        self._service_matcher = _get_glob_matcher(service) if service is not None else None
+        self._name_matcher = _get_glob_matcher(name) if name is not None else None
+        # span service and name pairs have a low cardinality, so the result of matching them is memoized
+        self._match_cache = {}  # type: Dict[Tuple[Optional[str], Optional[str]], bool]
 
     def sample(self, span):
         # type: (Span) -> bool
@@ -162,101 +236,193 @@ class SpanSamplingRule:
                 return True
         return False
 
-    def _sample(self, span):
+    def _sample_probabilistic(self, span):
         # type: (Span) -> bool
-        if self._sample_rate == 1:
-            return True
-        elif self._sample_rate == 0:
-            return False
-
-        return ((span.span_id * KNUTH_FACTOR) % MAX_SPAN_ID) <= self._sampling_id_threshold
+        return sample_span_id(span.span_id, self._sampling_id_threshold)
 
     def match(self, span):
         # type: (Span) -> bool
         """Determines if the span's service and name match the configured patterns"""
-        name = span.name
-        service = span.service
+        key = (span.service, span.name)
+        try:
+            return self._match_cache[key]
+        except KeyError:
+            pass
+
+        matched = self._match(*key)
+        if len(self._match_cache) >= _MATCH_CACHE_MAX_SIZE:
+            self._match_cache.clear()
+        self._match_cache[key] = matched
+        return matched
+
+    def _match(self, service, name):
+        # type: (Optional[str], Optional[str]) -> bool
         # If a span lacks a name and service, we can't match on it
         if service is None and name is None:
             return False
 
-        # Default to True, as the rule may not have a name or service rule
+        # The rule may not have a name or service rule
         # For whichever rules it does have, it will attempt to match on them
-        service_match = True
-        name_match = True
-
-        if self._service_matcher:
-            if service is None:
-                return False
-            else:
-                service_match = self._service_matcher.match(service)
-        if self._name_matcher:
+        if not self.match_service(service):
+            return False
+        if self._name_matcher is not None:
             if name is None:
                 return False
             else:
-                name_match = self._name_matcher.match(name)
-        return service_match and name_match
+                return self._name_matcher(name)
+        return True
+
+    @property
+    def literal_service(self):
+        # type: () -> Optional[str]
+        """The service matched by the rule when its service pattern has no wildcard, None otherwise"""
+        service = self._service_pattern
+        if service is not None and is_literal_glob(service):
+            return service
+        return None
+
+    def match_service(self, service):
+        # type: (Optional[str]) -> bool
+        """Determines if the service matches the configured service pattern, if the rule has one"""
+        if self._service_matcher is None:
+            return True
+        return service is not None and self._service_matcher(service)
 
-    def apply_span_sampling_tags(self, span):
-        # type: (Span) -> None
-        span.set_metric(_SINGLE_SPAN_SAMPLING_MECHANISM, SamplingMechanism.SPAN_SAMPLING_RULE)
-        span.set_metric(_SINGLE_SPAN_SAMPLING_RATE, self._sample_rate)
+    def apply_span_sampling_tags(
+        self,
+        span,  # type: Span
+        # The constants are bound as defaults so they are loaded as locals on this per-span path
+        _mechanism_key=_SINGLE_SPAN_SAMPLING_MECHANISM,  # type: str
+        _rate_key=_SINGLE_SPAN_SAMPLING_RATE,  # type: str
+        _max_per_sec_key=_SINGLE_SPAN_SAMPLING_MAX_PER_SEC,  # type: str
+        _mechanism=SamplingMechanism.SPAN_SAMPLING_RULE,  # type: int
+    ):
+        # type: (...) -> None
+        set_metric = span.set_metric
+        set_metric(_mechanism_key, _mechanism)
+        set_metric(_rate_key, self._sample_rate)
         # Only set this tag if it's not the default -1
         if self._max_per_second != -1:
-            span.set_metric(_SINGLE_SPAN_SAMPLING_MAX_PER_SEC, self._max_per_second)
+            set_metric(_max_per_sec_key, self._max_per_second)
 
 
 def get_span_sampling_rules():
-    # type: () -> List[SpanSamplingRule]
+    # type: () -> Tuple[SpanSamplingRule, ...]
     json_rules_raw = os.getenv("DD_SPAN_SAMPLING_RULES")
     if json_rules_raw is None:
-        return []
-    else:
-        sampling_rules = []
+        return ()
+
+    # Rules hold their own rate limiter, so new ones are created for every call
+    sampling_rules = []
+    for sample_rate, service, name, max_per_second in _parse_span_sampling_rules(json_rules_raw):
         try:
-            json_rules = json.loads(json_rules_raw)  # type: List[SpanSamplingRules]
-            if not isinstance(json_rules, list):
-                raise TypeError("DD_SPAN_SAMPLING_RULES is not list, got %r" % json_rules)
-        except JSONDecodeError:
-            raise ValueError("Unable to parse DD_SPAN_SAMPLING_RULES=%r" % json_rules_raw)
-        for rule in json_rules:
-            if not isinstance(rule, dict):
-                raise TypeError("rule specified via DD_SPAN_SAMPLING_RULES is not a dictionary:%r" % rule)
-            # If sample_rate not specified default to 100%
-            sample_rate = float(rule.get("sample_rate", 1.0))
-            service = rule.get("service")
-            name = rule.get("name")
-            # If max_per_second not specified default to no limit
-            max_per_second = int(rule.get("max_per_second", -1))
-            if service is None and name is None:
-                raise ValueError(
-                    "Neither service or name specified for single span sampling rule:%r,"
-                    "at least one of these must be specified" % rule
-                )
-            if service:
-                _check_unsupported_pattern(service)
-            if name:
-                _check_unsupported_pattern(name)
-
-            try:
-                sampling_rule = SpanSamplingRule(
-                    sample_rate=sample_rate, service=service, name=name, max_per_second=max_per_second
-                )
-            except Exception as e:
-                raise ValueError("Error creating single span sampling rule {}: {}".format(json.dumps(rule), e))
-            sampling_rules.append(sampling_rule)
-        return sampling_rules
+            sampling_rule = SpanSamplingRule(
+                sample_rate=sample_rate, service=service, name=name, max_per_second=max_per_second
+            )
+        except Exception as e:
+            rule = dict(sample_rate=sample_rate, service=service, name=name, max_per_second=max_per_second)
+            raise ValueError("Error creating single span sampling rule {}: {}".format(json.dumps(rule), e))
+        sampling_rules.append(sampling_rule)
+    return tuple(sampling_rules)
+
+
+@cached(maxsize=4)
+def _parse_span_sampling_rules(json_rules_raw):
+    # type: (str) -> Tuple[Tuple[float, Optional[str], Optional[str], int], ...]
+    # The decoded and validated rules are cached by their raw value
+    rule_specs = []
+    try:
+        json_rules = _json_loads(json_rules_raw)  # type: List[SpanSamplingRules]
+        if not isinstance(json_rules, list):
+            raise TypeError("DD_SPAN_SAMPLING_RULES is not list, got %r" % json_rules)
+    except JSONDecodeError:
+        raise ValueError("Unable to parse DD_SPAN_SAMPLING_RULES=%r" % json_rules_raw)
+    for rule in json_rules:
+        if not isinstance(rule, dict):
+            raise TypeError("rule specified via DD_SPAN_SAMPLING_RULES is not a dictionary:%r" % rule)
+        # If sample_rate not specified default to 100%
+        sample_rate = float(rule.get("sample_rate", 1.0))
+        service = rule.get("service")
+        name = rule.get("name")
+        # If max_per_second not specified default to no limit
+        max_per_second = int(rule.get("max_per_second", -1))
+        if service is None and name is None:
+            raise ValueError(
+                "Neither service or name specified for single span sampling rule:%r,"
+                "at least one of these must be specified" % rule
+            )
+        if service:
+            _check_unsupported_pattern(service)
+        if name:
+            _check_unsupported_pattern(name)
+        rule_specs.append((sample_rate, service, name, max_per_second))
+    return tuple(rule_specs)
+
+
+_UNSUPPORTED_GLOB_CHARS = frozenset("[]\\")
 
 
 def _check_unsupported_pattern(string):
     # type: (str) -> None
     # We don't support pattern bracket expansion or escape character
-    unsupported_chars = {"[", "]", "\\"}
-    for char in string:
-        if char in unsupported_chars:
-            raise ValueError("Unsupported Glob pattern found, character:%r is not supported" % char)
+    if not _UNSUPPORTED_GLOB_CHARS.isdisjoint(string):
+        char = next(c for c in string if c in _UNSUPPORTED_GLOB_CHARS)
+        raise ValueError("Unsupported Glob pattern found, character:%r is not supported" % char)
 
 
 def is_single_span_sampled(span):
     # type: (Span) -> bool
     return span.get_metric(_SINGLE_SPAN_SAMPLING_MECHANISM) == SamplingMechanism.SPAN_SAMPLING_RULE
+
+
+class SpanSamplingRuleSet(object):
+    """An ordered collection of span sampling rules indexed by their service pattern.
+
+    Rules with a literal service pattern are looked up by the span service instead of being
+    evaluated one by one. The rules that can apply to a given service are computed once and
+    memoized, while the first matching rule in the original order still wins.
+    """
+
+    __slots__ = ("rules", "_literal_rules", "_pattern_rules", "_candidates")
+
+    def __init__(self, rules):
+        # type: (Iterable[SpanSamplingRule]) -> None
+        self.rules = tuple(rules)
+        # rules with a literal service pattern, grouped by service
+        self._literal_rules = {}  # type: Dict[str, List[Tuple[int, SpanSamplingRule]]]
+        # rules with a wildcard service pattern or without one
+        self._pattern_rules = []  # type: List[Tuple[int, SpanSamplingRule]]
+        for index, rule in enumerate(self.rules):
+            service = rule.literal_service
+            if service is not None:
+                self._literal_rules.setdefault(service, []).append((index, rule))
+            else:
+                self._pattern_rules.append((index, rule))
+        self._candidates = {}  # type: Dict[Optional[str], Tuple[SpanSamplingRule, ...]]
+
+    def _get_candidates(self, service):
+        # type: (Optional[str]) -> Tuple[SpanSamplingRule, ...]
+        try:
+            return self._candidates[service]
+        except KeyError:
+            pass
+
+        found = list(self._literal_rules.get(service, ())) if service is not None else []
+        for index, rule in self._pattern_rules:
+            if rule.match_service(service):
+                found.append((index, rule))
+        found.sort(key=lambda indexed_rule: indexed_rule[0])
+        candidates = tuple(rule for _, rule in found)
+
+        if len(self._candidates) >= _RULE_SET_CACHE_MAX_SIZE:
+            self._candidates.clear()
+        self._candidates[service] = candidates
+        return candidates
+
+    def match(self, span):
+        # type: (Span) -> Optional[SpanSamplingRule]
+        """Returns the first rule matching the span, if any"""
+        for rule in self._get_candidates(span.service):
+            if rule.match(span):
+                return rule
+        return None
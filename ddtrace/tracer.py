@@ -11,7 +11,9 @@ from typing import Callable
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Set
+from typing import Tuple
 from typing import TypeVar
 from typing import Union
 
@@ -98,7 +100,7 @@ def _default_span_processors_factory(
     partial_flush_min_spans,  # type: int
     appsec_enabled,  # type: bool
     compute_stats_enabled,  # type: bool
-    single_span_sampling_rules,  # type: List[SpanSamplingRule]
+    single_span_sampling_rules,  # type: Sequence[SpanSamplingRule]
     agent_url,  # type: str
 ):
     # type: (...) -> List[SpanProcessor]
@@ -213,7 +215,7 @@ class Tracer(object):
                 sync_mode=self._use_sync_mode(),
                 headers={"Datadog-Client-Computed-Stats": "yes"} if self._compute_stats else {},
             )
-        self._single_span_sampling_rules = get_span_sampling_rules()  # type: List[SpanSamplingRule]
+        self._single_span_sampling_rules = get_span_sampling_rules()  # type: Tuple[SpanSamplingRule, ...]
         self._writer = writer  # type: TraceWriter
         self._partial_flush_enabled = asbool(os.getenv("DD_TRACE_PARTIAL_FLUSH_ENABLED", default=False))
         self._partial_flush_min_spans = int(os.getenv("DD_TRACE_PARTIAL_FLUSH_MIN_SPANS", default=500))
@@ -302,6 +302,11 @@ setup(
                 sources=["ddtrace/internal/_tagset.pyx"],
                 language="c",
             ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal._sampling",
+                sources=["ddtrace/internal/_sampling.pyx"],
+                language="c",
+            ),
             Extension(
                 "ddtrace.internal._encoding",
                 ["ddtrace/internal/_encoding.pyx"],
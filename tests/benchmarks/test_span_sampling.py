@@ -0,0 +1,24 @@
+import pytest
+
+from ddtrace.internal.sampling import KNUTH_FACTOR
+from ddtrace.internal.sampling import MAX_SPAN_ID
+
+
+SPAN_ID = 0xDEADBEEFCAFEBABE
+THRESHOLD = int(0.5 * MAX_SPAN_ID)
+MASK_64 = MAX_SPAN_ID - 1
+
+
+@pytest.mark.benchmark(group="span-sampling-hash", min_time=0.005)
+def test_sample_span_id(benchmark):
+    from ddtrace.internal._sampling import sample_span_id
+
+    benchmark(sample_span_id, SPAN_ID, THRESHOLD)
+
+
+@pytest.mark.benchmark(group="span-sampling-hash", min_time=0.005)
+def test_sample_span_id_python(benchmark):
+    def sample_span_id(span_id, threshold):
+        return ((span_id * KNUTH_FACTOR) & MASK_64) <= threshold
+
+    benchmark(sample_span_id, SPAN_ID, THRESHOLD)
@@ -1,6 +1,8 @@
 import pytest
 
 from ddtrace.internal.glob_matching import GlobMatcher
+from ddtrace.internal.glob_matching import compile_glob
+from ddtrace.internal.glob_matching import is_literal_glob
 
 
 @pytest.mark.parametrize(
@@ -28,8 +30,24 @@ from ddtrace.internal.glob_matching import GlobMatcher
         ("test/na{2}/string", "test/na{2}/string", True),
         ("*a*a*a*a*a*a", "aaaaaaaaaaaaaaaaaaaaaaaaaax", False),
         ("*a*a*a*a*a*a", "aaaaaaaarrrrrrraaaraaarararaarararaarararaaa", True),
+        ("", "", True),
+        ("", "test_string", False),
+        ("test_str*", "test_str", True),
+        ("test_str*", "test_st", False),
+        ("test_st?ing*", "test_string_a", True),
+        ("test?", "test\n", True),
+        ("test_string", "test_string\n", False),
     ],
 )
 def test_matching(pattern, string, result):
     glob_matcher = GlobMatcher(pattern)
     assert result == glob_matcher.match(string)
+    assert result == compile_glob(pattern)(string)
+
+
+@pytest.mark.parametrize(
+    "pattern,result",
+    [("test_string", True), ("", True), ("test_str*", False), ("test_st?ing", False), ("test/[a-d]/string", True)],
+)
+def test_is_literal_glob(pattern, result):
+    assert is_literal_glob(pattern) is result
@@ -359,6 +359,17 @@ def test_single_span_sampling_processor():
     assert_span_sampling_decision_tags(span)
 
 
+def test_single_span_sampling_processor_rules_snapshot():
+    """Test that the rules are copied so later changes to the given list do not desync the rule index"""
+
+    rule_1 = SpanSamplingRule(service="test_service", name="test_name", sample_rate=1.0, max_per_second=-1)
+    rules = [rule_1]
+    processor = SpanSamplingProcessor(rules)
+    rules.append(SpanSamplingRule(service="other_service", sample_rate=1.0, max_per_second=-1))
+
+    assert processor.rules == (rule_1,)
+
+
 def test_single_span_sampling_processor_match_second_rule():
     """Test that single span sampling rule is applied if the first rule does not match, but a later one does"""
 
@@ -408,6 +419,23 @@ def test_single_span_sampling_processor_rule_order_keep():
     assert_span_sampling_decision_tags(span)
 
 
+def test_single_span_sampling_processor_rule_order_wildcard_before_literal():
+    """Test that a rule with a wildcard service pattern is applied before a later rule
+    with a literal service pattern matching the same span
+    """
+
+    rule_1 = SpanSamplingRule(service="test_*", name="test_name", sample_rate=0, max_per_second=-1)
+    rule_2 = SpanSamplingRule(service="test_service", name="test_name", sample_rate=1.0, max_per_second=-1)
+    rules = [rule_1, rule_2]
+    processor = SpanSamplingProcessor(rules)
+    tracer = DummyTracer()
+    tracer._span_processors.append(processor)
+
+    span = traced_function(tracer)
+
+    assert_span_sampling_decision_tags(span, sample_rate=None, mechanism=None, limit=None)
+
+
 @pytest.mark.parametrize(
     "span_sample_rate_rule, expected_span_sample_rate_tag, mechanism, trace_sampling_priority",
     [
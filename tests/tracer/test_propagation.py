@@ -230,6 +230,9 @@ def test_extract_unicode(tracer):
         ("_dd.p.dm=--1", {"_dd.propagation_error": "decoding_error"}),
         ("_dd.p.dm=-1.0", {"_dd.propagation_error": "decoding_error"}),
         ("_dd.p.dm=-10", {"_dd.propagation_error": "decoding_error"}),
+        ("_dd.p.dm=-a", {"_dd.propagation_error": "decoding_error"}),
+        ("_dd.p.dm=0-", {"_dd.propagation_error": "decoding_error"}),
+        ("_dd.p.dm=-9", {"_dd.p.dm": "-9"}),
     ],
 )
 def test_extract_dm(x_datadog_tags, expected_trace_tags):
@@ -1,4 +1,5 @@
 import pytest
+from six.moves import intern
 
 from ddtrace.context import Context
 from ddtrace.internal.sampling import SamplingMechanism
@@ -19,6 +20,8 @@ def context():
         (SamplingMechanism.MANUAL, True, "-4"),
         (SamplingMechanism.DEFAULT, True, "-0"),
         (SamplingMechanism.DEFAULT, False, None),
+        (SamplingMechanism.SPAN_SAMPLING_RULE, True, "-8"),
+        (42, True, "-42"),
     ],
 )
 def test_trace_tag(context, sampling_mechanism, sampled, expected):
@@ -28,3 +31,17 @@ def test_trace_tag(context, sampling_mechanism, sampled, expected):
         assert context._meta["_dd.p.dm"] == expected
     else:
         assert "_dd.p.dm" not in context._meta
+
+
+def test_trace_tag_removed_when_rejected(context):
+    assert update_sampling_decision(context, SamplingMechanism.MANUAL, True) == "-4"
+    assert update_sampling_decision(context, SamplingMechanism.MANUAL, False) == "-4"
+    assert "_dd.p.dm" not in context._meta
+    assert update_sampling_decision(context, SamplingMechanism.MANUAL, False) is None
+
+
+def test_trace_tag_values_are_interned():
+    value = update_sampling_decision(Context(), SamplingMechanism.TRACE_SAMPLING_RULE, True)
+    assert value == "-3"
+    # build the expected value at runtime so that it isn't a code constant
+    assert value is intern("-%d" % SamplingMechanism.TRACE_SAMPLING_RULE)
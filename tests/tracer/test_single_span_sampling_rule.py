@@ -1,8 +1,17 @@
+import pytest
+import six
+
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_MAX_PER_SEC
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_MECHANISM
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_RATE
+from ddtrace.internal._sampling import sample_span_id
+from ddtrace.internal.rate_limiter import RateLimiter
+from ddtrace.internal.sampling import KNUTH_FACTOR
+from ddtrace.internal.sampling import MAX_SPAN_ID
 from ddtrace.internal.sampling import SamplingMechanism
 from ddtrace.internal.sampling import SpanSamplingRule
+from ddtrace.internal.sampling import SpanSamplingRuleSet
+from ddtrace.span import Span
 
 from ..utils import DummyTracer
 
@@ -170,3 +179,118 @@ def test_match_max_per_sec():
     rate_limited_span = traced_function(rule)
 
     assert_sampling_decision_tags(rate_limited_span, sample_rate=None, mechanism=None, limit=None)
+
+
+def test_match_is_memoized():
+    rule = SpanSamplingRule(service="test_*", name="test_name", sample_rate=1.0, max_per_second=-1)
+    tracer = DummyTracer()
+    with tracer.trace("test_name", service="test_service") as span:
+        pass
+    with tracer.trace("other_name", service="test_service") as other_span:
+        pass
+
+    assert rule.match(span) is True
+    assert rule.match(other_span) is False
+    assert rule._match_cache == {("test_service", "test_name"): True, ("test_service", "other_name"): False}
+    assert rule.match(span) is True
+
+
+def test_rules_share_compiled_patterns():
+    rule_1 = SpanSamplingRule(service="test_*", name="test_name", sample_rate=1.0, max_per_second=-1)
+    rule_2 = SpanSamplingRule(service="test_*", name="other_name", sample_rate=0.5, max_per_second=10)
+
+    assert rule_1._service_matcher is rule_2._service_matcher
+    assert rule_1._name_matcher is not rule_2._name_matcher
+
+
+@pytest.mark.parametrize("span_id", [-1, 0, 1, 2 ** 32 + 7, 2 ** 63, 2 ** 64 - 1, 2 ** 64 + 3, 2 ** 70 + 1])
+@pytest.mark.parametrize("sample_rate", [0.0, 0.1, 0.5, 0.99])
+def test_sample_span_id(span_id, sample_rate):
+    threshold = int(sample_rate * MAX_SPAN_ID)
+    expected = ((span_id * KNUTH_FACTOR) % MAX_SPAN_ID) <= threshold
+    assert sample_span_id(span_id, threshold) is expected
+
+
+def test_no_max_per_sec_skips_rate_limiter():
+    rule = SpanSamplingRule(service="test_service", name="test_name", sample_rate=1.0, max_per_second=-1)
+    assert not isinstance(rule._limiter, RateLimiter)
+    for _ in range(10):
+        span = traced_function(rule)
+        assert_sampling_decision_tags(span)
+
+
+def test_rule_set_match():
+    rule_1 = SpanSamplingRule(service="other_service", sample_rate=1.0, max_per_second=-1)
+    rule_2 = SpanSamplingRule(service="test_*", name="other_name", sample_rate=1.0, max_per_second=-1)
+    rule_3 = SpanSamplingRule(name="test_name", sample_rate=1.0, max_per_second=-1)
+    rule_4 = SpanSamplingRule(service="test_service", sample_rate=1.0, max_per_second=-1)
+    rule_set = SpanSamplingRuleSet([rule_1, rule_2, rule_3, rule_4])
+    tracer = DummyTracer()
+
+    with tracer.trace("test_name", service="test_service") as span:
+        pass
+    assert rule_set.match(span) is rule_3
+
+    with tracer.trace("other_name", service="test_service") as span:
+        pass
+    assert rule_set.match(span) is rule_2
+
+    with tracer.trace("unknown_name", service="test_service") as span:
+        pass
+    assert rule_set.match(span) is rule_4
+
+    with tracer.trace("unknown_name", service="other_service") as span:
+        pass
+    assert rule_set.match(span) is rule_1
+
+    with tracer.trace("unknown_name", service="unknown_service") as span:
+        pass
+    assert rule_set.match(span) is None
+
+    assert rule_set._candidates["test_service"] == (rule_2, rule_3, rule_4)
+
+
+def test_rule_literal_service():
+    rule = SpanSamplingRule(service="test_service", sample_rate=1.0, max_per_second=-1)
+    assert rule.literal_service == "test_service"
+    assert SpanSamplingRule(service="test_*", sample_rate=1.0, max_per_second=-1).literal_service is None
+    assert SpanSamplingRule(name="test_name", sample_rate=1.0, max_per_second=-1).literal_service is None
+
+
+@pytest.mark.parametrize(
+    "sample_rate,threshold",
+    [
+        (0.0, 0),
+        (0.5, 2 ** 63),
+        (0.25, 2 ** 62),
+        (0.9999999999999999, 2 ** 64 - 2 ** 11),
+        (1.0, 2 ** 64),
+        (float("inf"), 2 ** 64),
+        (float("nan"), 0),
+    ],
+)
+def test_sampling_id_threshold_is_int(sample_rate, threshold):
+    rule = SpanSamplingRule(service="test_service", sample_rate=sample_rate, max_per_second=-1)
+    assert isinstance(rule._sampling_id_threshold, six.integer_types)
+    assert rule._sampling_id_threshold == threshold
+
+
+@pytest.mark.parametrize("sample_rate,sampled", [(float("inf"), True), (float("nan"), False), (-1.0, False)])
+def test_non_finite_sample_rates(sample_rate, sampled):
+    rule = SpanSamplingRule(service="test_service", sample_rate=sample_rate, max_per_second=-1)
+    span = traced_function(rule)
+
+    if sampled:
+        # infinite metrics are not set on spans
+        assert_sampling_decision_tags(span, sample_rate=None)
+    else:
+        assert_sampling_decision_tags(span, sample_rate=None, mechanism=None, limit=None)
+
+
+def test_sample_rate_boundary():
+    # (span_id * KNUTH_FACTOR) % MAX_SPAN_ID == MAX_SPAN_ID - 1, the highest possible hash
+    span = Span("test_name", service="test_service", span_id=15049745075899203593)
+
+    assert SpanSamplingRule(service="test_service", sample_rate=1.0, max_per_second=-1)._sample(span) is True
+    rule = SpanSamplingRule(service="test_service", sample_rate=0.9999999999999999, max_per_second=-1)
+    assert rule._sample(span) is False
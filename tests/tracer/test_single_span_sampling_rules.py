@@ -1,3 +1,7 @@
+import json
+import math
+import sys
+
 import pytest
 
 from ddtrace import Tracer
@@ -6,6 +10,7 @@ from ddtrace.constants import _SINGLE_SPAN_SAMPLING_MAX_PER_SEC
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_MECHANISM
 from ddtrace.constants import _SINGLE_SPAN_SAMPLING_RATE
 from ddtrace.internal.sampling import SamplingMechanism
+from ddtrace.internal.sampling import _get_json_decoder
 from ddtrace.internal.sampling import get_span_sampling_rules
 from tests.utils import DummyWriter
 
@@ -19,8 +24,8 @@ def test_sampling_rule_init_via_env():
     ):
         sampling_rules = get_span_sampling_rules()
         assert sampling_rules[0]._sample_rate == 0.5
-        assert sampling_rules[0]._service_matcher.pattern == "xyz"
-        assert sampling_rules[0]._name_matcher.pattern == "abc"
+        assert sampling_rules[0]._service_pattern == "xyz"
+        assert sampling_rules[0]._name_pattern == "abc"
         assert sampling_rules[0]._max_per_second == 100
         assert len(sampling_rules) == 1
 
@@ -33,13 +38,13 @@ def test_sampling_rule_init_via_env():
     ):
         sampling_rules = get_span_sampling_rules()
         assert sampling_rules[0]._sample_rate == 1.0
-        assert sampling_rules[0]._service_matcher.pattern == "xy?"
-        assert sampling_rules[0]._name_matcher.pattern == "a*c"
+        assert sampling_rules[0]._service_pattern == "xy?"
+        assert sampling_rules[0]._name_pattern == "a*c"
         assert sampling_rules[0]._max_per_second == -1
 
         assert sampling_rules[1]._sample_rate == 0.5
-        assert sampling_rules[1]._service_matcher.pattern == "my-service"
-        assert sampling_rules[1]._name_matcher.pattern == "my-name"
+        assert sampling_rules[1]._service_pattern == "my-service"
+        assert sampling_rules[1]._name_pattern == "my-name"
         assert sampling_rules[1]._max_per_second == 20
         assert len(sampling_rules) == 2
 
@@ -47,7 +52,7 @@ def test_sampling_rule_init_via_env():
     with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"service":"xyz"}]')):
         sampling_rules = get_span_sampling_rules()
         assert sampling_rules[0]._sample_rate == 1.0
-        assert sampling_rules[0]._service_matcher.pattern == "xyz"
+        assert sampling_rules[0]._service_pattern == "xyz"
         assert sampling_rules[0]._max_per_second == -1
         assert len(sampling_rules) == 1
 
@@ -55,7 +60,7 @@ def test_sampling_rule_init_via_env():
     with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"name":"xyz"}]')):
         sampling_rules = get_span_sampling_rules()
         assert sampling_rules[0]._sample_rate == 1.0
-        assert sampling_rules[0]._name_matcher.pattern == "xyz"
+        assert sampling_rules[0]._name_pattern == "xyz"
         assert sampling_rules[0]._max_per_second == -1
         assert len(sampling_rules) == 1
 
@@ -75,12 +80,58 @@ def test_sampling_rule_init_via_env():
             sampling_rules = get_span_sampling_rules()
 
 
+def test_sampling_rules_are_independent():
+    with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"service":"xyz","name":"abc","max_per_second":1}]')):
+        sampling_rules = get_span_sampling_rules()
+        other_sampling_rules = get_span_sampling_rules()
+
+        assert sampling_rules[0] is not other_sampling_rules[0]
+        assert sampling_rules[0]._limiter is not other_sampling_rules[0]._limiter
+        assert other_sampling_rules[0]._max_per_second == 1
+
+
+@pytest.mark.parametrize("char", ["[", "]", "\\"])
+@pytest.mark.parametrize("field", ["service", "name"])
+def test_sampling_rule_unsupported_glob_char_via_env(field, char):
+    rules = json.dumps([{field: "xy%sz" % char}])
+    with override_env(dict(DD_SPAN_SAMPLING_RULES=rules)):
+        with pytest.raises(ValueError) as excinfo:
+            get_span_sampling_rules()
+        assert repr(char) in str(excinfo.value)
+
+
+@pytest.mark.parametrize("sample_rate", ['"inf"', '"nan"', "NaN", "Infinity", "1e400"])
+def test_sampling_rule_non_finite_sample_rate_via_env(sample_rate):
+    with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"service":"xyz","sample_rate":%s}]' % sample_rate)):
+        sampling_rules = get_span_sampling_rules()
+        assert len(sampling_rules) == 1
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_json_decoder(orjson_available, monkeypatch):
+    if orjson_available:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setitem(sys.modules, "orjson", None)
+
+    loads, decode_error = _get_json_decoder()
+
+    # Values accepted by the json module must be accepted whichever decoder is used
+    rules = loads('[{"service":"a","sample_rate":NaN},{"service":"b","sample_rate":1e400}]')
+    assert math.isnan(rules[0]["sample_rate"])
+    assert rules[1]["sample_rate"] == float("inf")
+    assert loads('[{"service":"a","sample_rate":0.5}]') == [{"service": "a", "sample_rate": 0.5}]
+
+    with pytest.raises(decode_error):
+        loads('[{"service":"a"')
+
+
 def test_rules_sample_span():
     """Test that single span sampling tags are applied to spans that should get sampled when envars set"""
     with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"service":"test_service","name":"test_name"}]')):
         sampling_rules = get_span_sampling_rules()
-        assert sampling_rules[0]._service_matcher.pattern == "test_service"
-        assert sampling_rules[0]._name_matcher.pattern == "test_name"
+        assert sampling_rules[0]._service_pattern == "test_service"
+        assert sampling_rules[0]._name_pattern == "test_name"
         tracer = Tracer()
         tracer.configure(writer=DummyWriter())
 
@@ -93,8 +144,8 @@ def test_rules_do_not_sample_wrong_span():
     """Test that single span sampling tags are not applied to spans that do not match rules"""
     with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"service":"test_ser","name":"test_na"}]')):
         sampling_rules = get_span_sampling_rules()
-        assert sampling_rules[0]._service_matcher.pattern == "test_ser"
-        assert sampling_rules[0]._name_matcher.pattern == "test_na"
+        assert sampling_rules[0]._service_pattern == "test_ser"
+        assert sampling_rules[0]._name_pattern == "test_na"
         tracer = Tracer()
         tracer.configure(writer=DummyWriter())
 
@@ -107,8 +158,8 @@ def test_single_span_rules_do_not_tag_if_tracer_samples():
     """Test that single span sampling rules aren't applied if a span is already going to be sampled by trace sampler"""
     with override_env(dict(DD_SPAN_SAMPLING_RULES='[{"service":"test_service","name":"test_name"}]')):
         sampling_rules = get_span_sampling_rules()
-        assert sampling_rules[0]._service_matcher.pattern == "test_service"
-        assert sampling_rules[0]._name_matcher.pattern == "test_name"
+        assert sampling_rules[0]._service_pattern == "test_service"
+        assert sampling_rules[0]._name_pattern == "test_name"
         tracer = Tracer()
         tracer.configure(writer=DummyWriter())
 